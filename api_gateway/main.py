@@ -3,33 +3,60 @@ API Gateway for DIAN Compliance Platform
 Handles routing, CORS, rate limiting, and request/response transformation.
 """
 
+import asyncio
+import gzip
+import logging
+import logging.handlers
+import queue
+import sys
 import time
-import uuid
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Callable, Dict, Union
+from functools import lru_cache
+from secrets import token_hex
+from typing import Any, AsyncGenerator, Dict, Tuple
 
 import httpx
-import redis
+import orjson
 import structlog
+import xxhash
 from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 from pydantic_settings import BaseSettings
-from starlette.middleware.base import BaseHTTPMiddleware
+from redis import asyncio as aioredis
+from starlette.background import BackgroundTask
 from starlette.responses import StreamingResponse
 
 from common.constants import (
     CORRELATION_ID_HEADER,
+    HEALTH_DEGRADED,
+    HEALTH_HEALTHY,
+    HEALTH_UNHEALTHY,
+    HTTP_SERVICE_UNAVAILABLE,
     APIMessages,
-    HealthStatus,
-    HTTPStatus,
-    ServiceName,
-    ServicePort,
 )
 
-# Configure structured logging
+
+def _orjson_serializer(obj: Any, **kwargs: Any) -> str:
+    """Serialize log records with orjson (C-accelerated, ~2x stdlib json)."""
+    return orjson.dumps(obj).decode()
+
+
+# Configure structured logging. Records are handed to a lock-free queue and
+# written to stderr by a background thread (started in lifespan), so request
+# coroutines never block on the actual write()
+_LOG_QUEUE: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _LOG_QUEUE, logging.StreamHandler(sys.stderr)
+)
+logging.basicConfig(
+    level=logging.INFO,
+    handlers=[logging.handlers.QueueHandler(_LOG_QUEUE)],
+    format="%(message)s",
+)
+
 structlog.configure(
     processors=[
         structlog.stdlib.filter_by_level,
@@ -40,7 +67,7 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
+        structlog.processors.JSONRenderer(serializer=_orjson_serializer),
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -59,6 +86,18 @@ REQUEST_DURATION = Histogram(
 )
 
 
+@lru_cache(maxsize=512)
+def _request_count_child(method: str, endpoint: str, status: int) -> Any:
+    """Cache Counter label children instead of re-resolving them per request."""
+    return REQUEST_COUNT.labels(method, endpoint, status)
+
+
+@lru_cache(maxsize=512)
+def _request_duration_child(method: str, endpoint: str) -> Any:
+    """Cache Histogram label children instead of re-resolving them per request."""
+    return REQUEST_DURATION.labels(method, endpoint)
+
+
 class Settings(BaseSettings):
     """Application settings."""
 
@@ -93,26 +132,156 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-# Redis client
-redis_client = redis.Redis(
+# Hot settings bound once at import: a module-level LOAD_GLOBAL is cheaper
+# than the LOAD_ATTR chain through the pydantic model on per-request paths
+RATE_LIMIT_PER_MINUTE = settings.default_requests_per_minute
+CORS_ORIGINS = tuple(settings.cors_origins.split(","))
+ALLOWED_HOSTS = tuple(settings.allowed_hosts.split(","))
+
+# Redis client (async so Redis round trips never block the event loop)
+redis_client = aioredis.Redis(
     host=settings.redis_host,
     port=settings.redis_port,
     password=settings.redis_password,
     decode_responses=True,
+    max_connections=50,
+)
+
+# Sliding-window rate limit script (atomic server-side check-and-increment).
+# KEYS[1] = rate limit key, ARGV = [now_ms, window_ms, limit, member]
+RATE_LIMIT_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1] - ARGV[2])
+local count = redis.call('ZCARD', KEYS[1])
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], math.floor(ARGV[2] / 1000) + 10)
+    return {1, count + 1}
+end
+return {0, count}
+"""
+
+# register_script computes the SHA locally and EVALSHAs on call,
+# falling back to EVAL transparently if the script is not cached.
+RATE_LIMIT_SCRIPT = redis_client.register_script(RATE_LIMIT_LUA)
+
+RATE_LIMIT_WINDOW_MS = 60_000
+
+
+@lru_cache(maxsize=4096)
+def _rate_limit_key(client_ip: str) -> str:
+    """Build a fixed-width, hash-tagged rate limit key for a client IP.
+
+    xxh3 keeps the key 16 hex chars regardless of IPv6 length, and the
+    {...} hash-tag pins all keys for one client to a single cluster slot
+    so the Lua script stays single-slot on Redis Cluster.
+    """
+    return f"rl:{{{xxhash.xxh3_64_hexdigest(client_ip.encode())}}}"
+
+
+# Raw ASGI header names (request headers arrive lowercased)
+CORRELATION_ID_HEADER_BYTES = CORRELATION_ID_HEADER.lower().encode()
+CORRELATION_ID_RESPONSE_HEADER_BYTES = CORRELATION_ID_HEADER.encode()
+USER_AGENT_HEADER_BYTES = b"user-agent"
+
+# Headers that apply to a single connection and must not be forwarded by a
+# proxy (RFC 7230 section 6.1), plus host which httpx derives from the URL
+HOP_BY_HOP_HEADERS = frozenset(
+    (
+        b"host",
+        b"connection",
+        b"keep-alive",
+        b"transfer-encoding",
+        b"te",
+        b"trailers",
+        b"proxy-authorization",
+        b"upgrade",
+    )
+)
+
+# HTTP client: HTTP/2 multiplexes proxied requests over one connection per
+# backend; the pool is sized explicitly instead of relying on defaults
+http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(connect=2.0, read=30.0, write=10.0, pool=1.0),
+    limits=httpx.Limits(
+        max_connections=500,
+        max_keepalive_connections=200,
+        keepalive_expiry=30.0,
+    ),
+)
+
+
+class CircuitBreaker:
+    """Track consecutive failures per backend and short-circuit while open.
+
+    After `threshold` consecutive failures the breaker opens and requests are
+    rejected immediately with 503 instead of tying up a worker slot for the
+    full downstream timeout. Once `reset_timeout` elapses the next request is
+    let through as a probe; its outcome closes or re-opens the breaker.
+    """
+
+    __slots__ = ("fails", "opened_at")
+
+    threshold = 3
+    reset_timeout = 30.0
+
+    def __init__(self) -> None:
+        self.fails = 0
+        self.opened_at = 0.0
+
+    def is_open(self) -> bool:
+        return (
+            self.opened_at > 0
+            and time.monotonic() - self.opened_at < self.reset_timeout
+        )
+
+    def record_failure(self) -> None:
+        self.fails += 1
+        if self.fails >= self.threshold:
+            self.opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        self.fails = 0
+        self.opened_at = 0.0
+
+
+BREAKERS: Dict[str, CircuitBreaker] = {}
+
+# Prefix routing table for the proxied services. The ASGI middleware matches
+# against this directly, so proxied requests never pay Starlette's per-route
+# regex walk or FastAPI's dependency resolution.
+PREFIX_TABLE = (
+    ("/auth/", settings.auth_service_url),
+    ("/dian/", settings.dian_processing_service_url),
+    ("/excel/", settings.excel_service_url),
+    ("/pdf/", settings.pdf_service_url),
 )
 
-# HTTP client
-http_client = httpx.AsyncClient(timeout=30.0)
+PROXY_METHODS = frozenset(("GET", "POST", "PUT", "DELETE"))
+
+# Pre-parsed base URLs so proxying joins a relative path instead of
+# re-parsing a full URL string per request
+SERVICE_BASE_URLS = {
+    service_url: httpx.URL(f"{service_url}/") for _, service_url in PREFIX_TABLE
+}
+SERVICE_HEALTH_URLS = {
+    service_url: httpx.URL(f"{service_url}/health") for _, service_url in PREFIX_TABLE
+}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
+    _log_listener.start()
     logger.info("Starting API Gateway", service_name=settings.service_name)
 
     # Test Redis connection
     try:
-        redis_client.ping()
+        await redis_client.ping()
+        # Upload the rate limit script eagerly: the first request burst then
+        # EVALSHAs a pre-cached script instead of racing lazy SCRIPT LOADs,
+        # and redis-py's NOSCRIPT fallback stays as the retry path
+        await redis_client.script_load(RATE_LIMIT_LUA)
         logger.info("Redis connection established")
     except Exception as e:
         logger.error("Redis connection failed", error=str(e))
@@ -120,7 +289,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     yield
 
     logger.info("Shutting down API Gateway")
+    await redis_client.aclose()
     await http_client.aclose()
+    _log_listener.stop()
 
 
 # Create FastAPI application
@@ -131,163 +302,254 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    # orjson serializes endpoint payloads at C level instead of stdlib json
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
-# Add middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins.split(","),
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.add_middleware(
-    TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts.split(",")
-)
-
-
-@app.middleware("http")
-async def add_correlation_id(
-    request: Request, call_next: Callable
-) -> Union[Response, Any]:
-    """Add correlation ID to requests."""
-    correlation_id = request.headers.get(CORRELATION_ID_HEADER, str(uuid.uuid4()))
-    request.state.correlation_id = correlation_id
-
-    # Add correlation ID to response headers
-    response = await call_next(request)
-    response.headers[CORRELATION_ID_HEADER] = correlation_id
-
-    return response
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next: Callable) -> Union[Response, Any]:
-    """Log all requests and responses."""
-    start_time = time.time()
-    correlation_id = getattr(request.state, "correlation_id", "unknown")
-
-    # Log request
-    logger.info(
-        "Incoming request",
-        method=request.method,
-        url=str(request.url),
-        correlation_id=correlation_id,
-        user_agent=request.headers.get("user-agent"),
-        client_ip=request.client.host if request.client else None,
-    )
-
-    # Process request
-    response = await call_next(request)
+class GatewayMiddleware:
+    """Pure-ASGI middleware for correlation IDs, rate limiting, logging and metrics.
+
+    A single `(scope, receive, send)` pass replaces the three stacked
+    `BaseHTTPMiddleware` handlers, avoiding the per-request task tree and
+    response buffering that `BaseHTTPMiddleware` introduces.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Correlation ID straight from the raw ASGI headers
+        correlation_id = None
+        user_agent = None
+        for key, value in scope["headers"]:
+            if key == CORRELATION_ID_HEADER_BYTES:
+                correlation_id = value.decode()
+            elif key == USER_AGENT_HEADER_BYTES:
+                user_agent = value.decode()
+        if correlation_id is None:
+            # token_hex is a thin wrapper over os.urandom with C-level hex
+            # formatting, skipping the UUID class construction entirely;
+            # 96 bits is plenty of entropy for a correlation id
+            correlation_id = token_hex(12)
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
+
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+
+        # Rate limiting
+        key = _rate_limit_key(client_ip)
+        try:
+            # Atomic sliding-window check: one round trip, no GET/INCR race
+            allowed, _count = await RATE_LIMIT_SCRIPT(
+                keys=[key],
+                args=[
+                    int(time.time() * 1000),
+                    RATE_LIMIT_WINDOW_MS,
+                    RATE_LIMIT_PER_MINUTE,
+                    time.monotonic_ns(),
+                ],
+            )
+            if not allowed:
+                logger.warning(
+                    "Rate limit exceeded",
+                    client_ip=client_ip,
+                    correlation_id=correlation_id,
+                )
+                limited = JSONResponse(
+                    status_code=429, content={"detail": "Rate limit exceeded"}
+                )
+                limited.headers[CORRELATION_ID_HEADER] = correlation_id
+                await limited(scope, receive, send)
+                return
+        except Exception as e:
+            # Only log error if not in testing environment
+            if settings.environment != "testing":
+                logger.error("Rate limiting error", error=str(e))
+            # Continue without rate limiting if Redis is unavailable
+
+        start_ns = time.perf_counter_ns()
+
+        # Per-request arrival log is debug-only; the completion log below
+        # already carries method, path, status and duration
+        logger.debug(
+            "Incoming request",
+            method=method,
+            url=path,
+            correlation_id=correlation_id,
+            user_agent=user_agent,
+            client_ip=client_ip,
+        )
 
-    # Calculate duration
-    duration = time.time() - start_time
+        status_code = 500
+        correlation_id_bytes = correlation_id.encode()
+
+        async def send_wrapper(message: Any) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = message.setdefault("headers", [])
+                headers.append(
+                    (CORRELATION_ID_RESPONSE_HEADER_BYTES, correlation_id_bytes)
+                )
+            await send(message)
+
+        # One prefix check against the proxy table replaces a full route walk
+        # for proxied traffic; everything else falls through to FastAPI
+        proxied_endpoint = None
+        matched_prefix = ""
+        matched_service_url = ""
+        if method in PROXY_METHODS:
+            for prefix, service_url in PREFIX_TABLE:
+                if path.startswith(prefix):
+                    proxied_endpoint = prefix + "{path}"
+                    matched_prefix = prefix
+                    matched_service_url = service_url
+                    break
 
-    # Log response
-    logger.info(
-        "Request completed",
-        method=request.method,
-        url=str(request.url),
-        status_code=response.status_code,
-        duration=duration,
-        correlation_id=correlation_id,
-    )
+        try:
+            if proxied_endpoint is not None:
+                response: Response
+                try:
+                    response = await proxy_request(
+                        Request(scope, receive),
+                        matched_service_url,
+                        path[len(matched_prefix) :],
+                        correlation_id,
+                    )
+                except HTTPException as exc:
+                    response = JSONResponse(
+                        status_code=exc.status_code, content={"detail": exc.detail}
+                    )
+                await response(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
+
+            # Log response
+            logger.info(
+                "Request completed",
+                method=method,
+                url=path,
+                status_code=status_code,
+                duration=duration,
+                correlation_id=correlation_id,
+            )
 
-    # Record metrics
-    REQUEST_COUNT.labels(
-        method=request.method, endpoint=request.url.path, status=response.status_code
-    ).inc()
+            # Record metrics, labelling by route template where one matched so
+            # label cardinality stays bounded to #routes x #statuses
+            endpoint = proxied_endpoint
+            if endpoint is None:
+                route = scope.get("route")
+                endpoint = route.path if route is not None else path
+            _request_count_child(method, endpoint, status_code).inc()
+            _request_duration_child(method, endpoint).observe(duration)
 
-    REQUEST_DURATION.labels(method=request.method, endpoint=request.url.path).observe(
-        duration
-    )
 
-    return response
+# Add middleware. GatewayMiddleware is registered first so it sits innermost:
+# its proxy short-circuit and rate-limit responses still travel back out
+# through CORSMiddleware and TrustedHostMiddleware
+app.add_middleware(GatewayMiddleware)
 
+# Concrete method/header lists (instead of "*") let browsers cache the
+# preflight verdict for max_age seconds rather than re-asking per combination
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type", CORRELATION_ID_HEADER],
+    max_age=86400,
+)
 
-@app.middleware("http")
-async def rate_limit_middleware(
-    request: Request, call_next: Callable
-) -> Union[Response, Any]:
-    """Rate limiting middleware."""
-    client_ip = request.client.host if request.client else "unknown"
-    key = f"rate_limit:{client_ip}"
+app.add_middleware(TrustedHostMiddleware, allowed_hosts=ALLOWED_HOSTS)
 
-    try:
-        # Check rate limit
-        current_requests = redis_client.get(key)
-        if (
-            current_requests
-            and int(str(current_requests)) >= settings.default_requests_per_minute
-        ):
-            logger.warning(
-                "Rate limit exceeded",
-                client_ip=client_ip,
-                correlation_id=getattr(request.state, "correlation_id", "unknown"),
-            )
-            return JSONResponse(
-                status_code=429, content={"detail": "Rate limit exceeded"}
-            )
 
-        # Increment request count
-        pipe = redis_client.pipeline()
-        pipe.incr(key)
-        pipe.expire(key, 60)  # 1 minute window
-        pipe.execute()
+# Health probes are cheap but load balancers poll /health aggressively;
+# cache the aggregated result briefly so probes don't stampede downstream
+HEALTH_CACHE_TTL = 5.0
+HEALTH_PROBE_TIMEOUT = httpx.Timeout(connect=1.0, read=2.0, write=2.0, pool=2.0)
 
-    except Exception as e:
-        # Only log error if not in testing environment
-        if settings.environment != "testing":
-            logger.error("Rate limiting error", error=str(e))
-        # Continue without rate limiting if Redis is unavailable
+_health_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
 
-    return await call_next(request)
 
+def get_redis() -> aioredis.Redis:
+    """Dependency accessor for the shared Redis client.
 
-async def get_correlation_id(request: Request) -> str:
-    """Get correlation ID from request."""
-    return getattr(request.state, "correlation_id", str(uuid.uuid4()))
+    Lets tests swap the client via app.dependency_overrides instead of
+    monkey patching the module attribute.
+    """
+    return redis_client
 
 
 @app.get("/health")
-async def health_check() -> Dict[str, Any]:
+async def health_check(
+    redis: aioredis.Redis = Depends(get_redis),
+) -> Dict[str, Any]:
     """Health check endpoint."""
-    try:
-        # Check Redis connection
-        redis_client.ping()
-        redis_status = HealthStatus.HEALTHY
-    except Exception:
-        redis_status = HealthStatus.UNHEALTHY
+    global _health_cache
 
-    # Check downstream services
-    services_status = {}
+    now = time.monotonic()
+    cached_at, cached_payload = _health_cache
+    if now - cached_at < HEALTH_CACHE_TTL:
+        return cached_payload
 
-    for service_name, service_url in [
+    services = [
         ("auth_service", settings.auth_service_url),
         ("dian_processing_service", settings.dian_processing_service_url),
         ("excel_service", settings.excel_service_url),
         ("pdf_service", settings.pdf_service_url),
-    ]:
-        try:
-            response = await http_client.get(f"{service_url}/health")
-            services_status[service_name] = (
-                HealthStatus.HEALTHY
-                if response.status_code == 200
-                else HealthStatus.UNHEALTHY
+    ]
+
+    # Services behind an open circuit breaker are reported unhealthy without
+    # probing; everything else is probed concurrently, so /health costs
+    # max(latencies) instead of their sum
+    services_status = {}
+    probed = []
+    for service_name, service_url in services:
+        if BREAKERS.setdefault(service_url, CircuitBreaker()).is_open():
+            services_status[service_name] = HEALTH_UNHEALTHY
+        else:
+            probed.append((service_name, service_url))
+
+    results = await asyncio.gather(
+        redis.ping(),
+        *(
+            http_client.get(
+                SERVICE_HEALTH_URLS[service_url], timeout=HEALTH_PROBE_TIMEOUT
             )
-        except Exception:
-            services_status[service_name] = HealthStatus.UNHEALTHY
+            for _, service_url in probed
+        ),
+        return_exceptions=True,
+    )
+
+    redis_status = (
+        HEALTH_UNHEALTHY if isinstance(results[0], BaseException) else HEALTH_HEALTHY
+    )
 
-    overall_status = HealthStatus.HEALTHY
+    for (service_name, _), result in zip(probed, results[1:]):
+        services_status[service_name] = (
+            HEALTH_HEALTHY
+            if isinstance(result, httpx.Response) and result.status_code == 200
+            else HEALTH_UNHEALTHY
+        )
+
+    overall_status = HEALTH_HEALTHY
     if (
-        any(status == HealthStatus.UNHEALTHY for status in services_status.values())
-        or redis_status == HealthStatus.UNHEALTHY
+        any(status == HEALTH_UNHEALTHY for status in services_status.values())
+        or redis_status == HEALTH_UNHEALTHY
     ):
-        overall_status = HealthStatus.DEGRADED
+        overall_status = HEALTH_DEGRADED
 
-    return {
+    payload = {
         "status": overall_status,
         "service": settings.service_name,
         "version": settings.service_version,
@@ -295,82 +557,101 @@ async def health_check() -> Dict[str, Any]:
         "dependencies": {"redis": redis_status, **services_status},
         "timestamp": time.time(),
     }
+    _health_cache = (now, payload)
+    return payload
 
 
-@app.get("/metrics")
-async def metrics() -> Response:
-    """Prometheus metrics endpoint."""
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+# Scrapers poll every few seconds; caching the rendered exposition for one
+# second amortizes the collector walk across all scrapers in that window
+METRICS_CACHE_TTL = 1.0
 
+_metrics_cache: tuple = (0.0, b"", b"")
 
-# Service routing
-@app.api_route("/auth/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
-async def auth_service_proxy(
-    request: Request, path: str, correlation_id: str = Depends(get_correlation_id)
-) -> Response:
-    """Proxy requests to Auth Service."""
-    return await proxy_request(request, settings.auth_service_url, path, correlation_id)
-
-
-@app.api_route("/dian/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
-async def dian_service_proxy(
-    request: Request, path: str, correlation_id: str = Depends(get_correlation_id)
-) -> Response:
-    """Proxy requests to DIAN Processing Service."""
-    return await proxy_request(
-        request, settings.dian_processing_service_url, path, correlation_id
-    )
 
+@app.get("/metrics")
+async def metrics(request: Request) -> Response:
+    """Prometheus metrics endpoint."""
+    global _metrics_cache
 
-@app.api_route("/excel/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
-async def excel_service_proxy(
-    request: Request, path: str, correlation_id: str = Depends(get_correlation_id)
-) -> Response:
-    """Proxy requests to Excel Service."""
-    return await proxy_request(
-        request, settings.excel_service_url, path, correlation_id
-    )
-
+    now = time.monotonic()
+    rendered_at, raw, compressed = _metrics_cache
+    if now - rendered_at > METRICS_CACHE_TTL:
+        raw = generate_latest()
+        # Level 1 is plenty: exposition text compresses ~10x even there
+        compressed = gzip.compress(raw, compresslevel=1)
+        _metrics_cache = (now, raw, compressed)
 
-@app.api_route("/pdf/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
-async def pdf_service_proxy(
-    request: Request, path: str, correlation_id: str = Depends(get_correlation_id)
-) -> Response:
-    """Proxy requests to PDF Service."""
-    return await proxy_request(request, settings.pdf_service_url, path, correlation_id)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=compressed,
+            media_type=CONTENT_TYPE_LATEST,
+            headers={"Content-Encoding": "gzip"},
+        )
+    return Response(content=raw, media_type=CONTENT_TYPE_LATEST)
 
 
+# Service routing happens in GatewayMiddleware via PREFIX_TABLE
 async def proxy_request(
     request: Request, service_url: str, path: str, correlation_id: str
 ) -> Response:
     """Proxy request to downstream service."""
-    target_url = f"{service_url}/{path}"
+    breaker = BREAKERS.setdefault(service_url, CircuitBreaker())
+    if breaker.is_open():
+        logger.warning(
+            "Circuit breaker open, short-circuiting request",
+            service_url=service_url,
+            path=path,
+            correlation_id=correlation_id,
+        )
+        raise HTTPException(
+            status_code=HTTP_SERVICE_UNAVAILABLE,
+            detail=APIMessages.SERVICE_UNAVAILABLE,
+        )
 
-    # Prepare headers
-    headers = dict(request.headers)
-    headers[CORRELATION_ID_HEADER] = correlation_id
+    target_url = SERVICE_BASE_URLS[service_url].join(path)
 
-    # Remove host header to avoid conflicts
-    headers.pop("host", None)
+    # Forward the raw ASGI header tuples minus hop-by-hop headers, skipping
+    # the dict materialization Starlette's Headers would do per request
+    headers = [
+        (key, value)
+        for key, value in request.scope["headers"]
+        # The correlation id is re-appended below; dropping any client-sent
+        # copy here keeps the forwarded header single-valued
+        if key not in HOP_BY_HOP_HEADERS and key != CORRELATION_ID_HEADER_BYTES
+    ]
+    headers.append((CORRELATION_ID_HEADER_BYTES, correlation_id.encode()))
 
     try:
-        # Forward request
-        response = await http_client.request(
+        # Stream both directions chunk by chunk: uploads are forwarded from
+        # request.stream() without buffering the body (50 MB files would
+        # otherwise be materialized in the gateway), and the response body
+        # is relayed the same way below
+        proxied = http_client.build_request(
             method=request.method,
             url=target_url,
             headers=headers,
             params=request.query_params,
-            content=await request.body(),
+            content=request.stream(),
         )
+        response = await http_client.send(proxied, stream=True)
+        breaker.record_success()
 
-        # Return response
-        return Response(
-            content=response.content,
+        return StreamingResponse(
+            response.aiter_raw(chunk_size=65536),
             status_code=response.status_code,
-            headers=dict(response.headers),
+            headers={
+                key: value
+                for key, value in response.headers.items()
+                # Backends may echo the forwarded correlation id; drop it so
+                # the middleware's appended copy stays the only one
+                if key.encode() not in HOP_BY_HOP_HEADERS
+                and key.encode() != CORRELATION_ID_HEADER_BYTES
+            },
+            background=BackgroundTask(response.aclose),
         )
 
     except httpx.RequestError as e:
+        breaker.record_failure()
         logger.error(
             "Service request failed",
             service_url=service_url,
@@ -379,7 +660,7 @@ async def proxy_request(
             correlation_id=correlation_id,
         )
         raise HTTPException(
-            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            status_code=HTTP_SERVICE_UNAVAILABLE,
             detail=APIMessages.SERVICE_UNAVAILABLE,
         )
 
@@ -398,6 +679,20 @@ async def root() -> Dict[str, Any]:
 
 
 if __name__ == "__main__":
+    import os
+
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop and httptools replace the stdlib event loop and h11 parser with
+    # their C implementations; uvicorn's access log is redundant with the
+    # gateway middleware's own request logging
+    uvicorn.run(
+        "api_gateway.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=max(2, os.cpu_count() or 1),
+        log_config=None,
+        access_log=False,
+    )
@@ -4,40 +4,36 @@ Shared constants for DIAN Compliance Platform microservices.
 
 import os
 from enum import Enum
-from typing import List
-
+from typing import Final, List
 
 # Service Names
-class ServiceName(str, Enum):
-    API_GATEWAY = "api_gateway"
-    AUTH_SERVICE = "auth_service"
-    DIAN_PROCESSING = "dian_processing_service"
-    EXCEL_SERVICE = "excel_service"
-    PDF_SERVICE = "pdf_service"
-
+# Plain Final constants: these are compared on hot request paths, where an
+# enum member costs an EnumMeta attribute lookup plus __eq__ dispatch per use
+SERVICE_NAME_API_GATEWAY: Final[str] = "api_gateway"
+SERVICE_NAME_AUTH_SERVICE: Final[str] = "auth_service"
+SERVICE_NAME_DIAN_PROCESSING: Final[str] = "dian_processing_service"
+SERVICE_NAME_EXCEL_SERVICE: Final[str] = "excel_service"
+SERVICE_NAME_PDF_SERVICE: Final[str] = "pdf_service"
 
 # Service Ports
-class ServicePort(int, Enum):
-    API_GATEWAY = 8000
-    AUTH_SERVICE = 8001
-    DIAN_PROCESSING = 8002
-    EXCEL_SERVICE = 8003
-    PDF_SERVICE = 8004
-
+SERVICE_PORT_API_GATEWAY: Final[int] = 8000
+SERVICE_PORT_AUTH_SERVICE: Final[int] = 8001
+SERVICE_PORT_DIAN_PROCESSING: Final[int] = 8002
+SERVICE_PORT_EXCEL_SERVICE: Final[int] = 8003
+SERVICE_PORT_PDF_SERVICE: Final[int] = 8004
 
 # HTTP Status Codes
-class HTTPStatus(int, Enum):
-    OK = 200
-    CREATED = 201
-    NO_CONTENT = 204
-    BAD_REQUEST = 400
-    UNAUTHORIZED = 401
-    FORBIDDEN = 403
-    NOT_FOUND = 404
-    CONFLICT = 409
-    UNPROCESSABLE_ENTITY = 422
-    INTERNAL_SERVER_ERROR = 500
-    SERVICE_UNAVAILABLE = 503
+HTTP_OK: Final[int] = 200
+HTTP_CREATED: Final[int] = 201
+HTTP_NO_CONTENT: Final[int] = 204
+HTTP_BAD_REQUEST: Final[int] = 400
+HTTP_UNAUTHORIZED: Final[int] = 401
+HTTP_FORBIDDEN: Final[int] = 403
+HTTP_NOT_FOUND: Final[int] = 404
+HTTP_CONFLICT: Final[int] = 409
+HTTP_UNPROCESSABLE_ENTITY: Final[int] = 422
+HTTP_INTERNAL_SERVER_ERROR: Final[int] = 500
+HTTP_SERVICE_UNAVAILABLE: Final[int] = 503
 
 
 # File Types
@@ -162,10 +158,9 @@ CORRELATION_ID_HEADER = "X-Correlation-ID"
 
 
 # Health Check Constants
-class HealthStatus(str, Enum):
-    HEALTHY = "healthy"
-    UNHEALTHY = "unhealthy"
-    DEGRADED = "degraded"
+HEALTH_HEALTHY: Final[str] = "healthy"
+HEALTH_UNHEALTHY: Final[str] = "unhealthy"
+HEALTH_DEGRADED: Final[str] = "degraded"
 
 
 # Metrics Constants
@@ -14,22 +14,28 @@ setup(
     install_requires=[
         "fastapi>=0.104.1",
         "uvicorn[standard]>=0.24.0",
-        "httpx>=0.25.2",
+        "httpx[http2]>=0.25.2",
         "redis>=5.0.1",
         "python-jose>=3.3.0",
         "cryptography>=41.0.7",
         "python-multipart>=0.0.6",
         "pydantic>=2.5.0",
         "pydantic-settings>=2.1.0",
+        "orjson>=3.9.0",
         "prometheus-client>=0.19.0",
         "structlog>=23.2.0",
         "python-json-logger>=2.0.7",
+        "xxhash>=3.4.0",
     ],
     extras_require={
         "dev": [
             "pytest>=8.4.1",
             "pytest-cov>=6.2.1",
             "pytest-asyncio>=1.1.0",
+            "pytest-xdist>=3.5.0",
+            "respx>=0.20.2",
+            "pytest-testmon>=2.1.0",
+            "fakeredis[lua]>=2.21.0",
             "black>=23.0.0",
             "isort>=5.12.0",
             "flake8>=6.0.0",
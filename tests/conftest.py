@@ -0,0 +1,41 @@
+"""
+Shared pytest fixtures for DIAN Compliance Platform tests.
+"""
+
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+import pytest_asyncio
+
+import api_gateway.main
+from api_gateway.main import app
+
+
+@pytest.fixture(autouse=True)
+def _allow_rate_limit(monkeypatch):
+    """Replace the rate-limit script with an allow-all stub for every test.
+
+    GatewayMiddleware calls RATE_LIMIT_SCRIPT directly (not through FastAPI
+    DI), so the get_redis override cannot reach it: without this stub each
+    request either pays a connect timeout to the configured Redis host or,
+    where that host resolves, mutates live rate-limit state. Tests that
+    assert rate-limit behavior patch the script themselves.
+    """
+    monkeypatch.setattr(
+        api_gateway.main, "RATE_LIMIT_SCRIPT", AsyncMock(return_value=(1, 1))
+    )
+
+
+@pytest_asyncio.fixture
+async def client():
+    """httpx client speaking ASGI to the gateway app in-process.
+
+    ASGITransport stays on the test's event loop, unlike the sync
+    TestClient which bridges through an anyio portal thread per request.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver"
+    ) as async_client:
+        yield async_client
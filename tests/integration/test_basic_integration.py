@@ -2,7 +2,6 @@
 Basic integration tests for DIAN Compliance Platform.
 """
 
-import pytest
 from fastapi.testclient import TestClient
 
 from api_gateway.main import app
@@ -2,8 +2,6 @@
 Simple integration tests that don't require any external services.
 """
 
-import pytest
-
 
 def test_simple_integration():
     """Simple test to verify integration test framework works."""
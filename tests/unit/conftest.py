@@ -0,0 +1,85 @@
+"""
+Fixtures for API Gateway unit tests.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import fakeredis
+import httpx
+import pytest
+
+import api_gateway.main
+
+# Canned 200 health probe shared by every test; a real httpx.Response so the
+# gateway's isinstance narrowing treats it as a successful probe
+OK_PROBE = httpx.Response(200)
+
+
+class _StreamBody(httpx.AsyncByteStream):
+    """Minimal async byte stream for faking streamed httpx responses."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    async def __aiter__(self):
+        yield self._data
+
+
+def streamed_response(content: bytes = b'{"message": "success"}') -> httpx.Response:
+    """Build an httpx.Response whose body can still be streamed."""
+    return httpx.Response(200, stream=_StreamBody(content))
+
+
+class FakeRedis:
+    """In-process stand-in for the async Redis client.
+
+    Plain method dispatch instead of Mock call bookkeeping; set
+    ``ping_error`` to simulate a failing backend.
+    """
+
+    def __init__(self, ping_error: Exception = None) -> None:
+        self.ping_error = ping_error
+
+    async def ping(self) -> bool:
+        if self.ping_error is not None:
+            raise self.ping_error
+        return True
+
+
+@pytest.fixture
+def fake_redis():
+    """fakeredis client with real Redis command (and Lua) semantics.
+
+    Function-scoped rather than session-scoped because the async client
+    binds to the running event loop, and pytest-asyncio gives each test
+    its own loop.
+    """
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def mock_redis():
+    """Swap in a healthy FakeRedis via the get_redis dependency.
+
+    Tests that need failure behavior set ``mock_redis.ping_error``.
+    """
+    fake = FakeRedis()
+    app = api_gateway.main.app
+    app.dependency_overrides[api_gateway.main.get_redis] = lambda: fake
+    yield fake
+    app.dependency_overrides.pop(api_gateway.main.get_redis, None)
+
+
+@pytest.fixture
+def mock_http(monkeypatch):
+    """Patch the gateway's HTTP client with healthy canned responses.
+
+    Health probes (`get`) return 200 and proxied sends return a streamable
+    success body; failure tests override `send` on the yielded mock.
+    """
+    mock = Mock(spec=httpx.AsyncClient)
+    mock.get = AsyncMock(return_value=OK_PROBE)
+    mock.build_request = Mock()
+    mock.send = AsyncMock(return_value=streamed_response())
+    monkeypatch.setattr(api_gateway.main, "http_client", mock)
+    return mock
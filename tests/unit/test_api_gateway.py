@@ -1,96 +1,55 @@
 """
 Unit tests for API Gateway service.
+
+Convention: call ``response.json()`` at most once per test and assert on the
+resulting dict — httpx does not cache the parsed body between calls.
 """
 
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+import respx
+from starlette.middleware.cors import CORSMiddleware
 
-from api_gateway.main import app
+import api_gateway.main
 
-client = TestClient(app)
+# Canned proxy success payload, built once for the whole module
+_SUCCESS_JSON = {"message": "success"}
 
 
 class TestHealthCheck:
     """Test health check endpoint."""
 
-    def test_health_check_success(self):
+    async def test_health_check_success(self, mock_redis, mock_http, client):
         """Test successful health check."""
-        with (
-            patch("api_gateway.main.redis_client") as mock_redis,
-            patch("api_gateway.main.http_client") as mock_http,
-        ):
-
-            # Mock Redis methods for rate limiting
-            mock_redis.get.return_value = "10"  # Normal rate limit count
-            mock_pipeline = Mock()
-            mock_redis.pipeline.return_value = mock_pipeline
-            mock_pipeline.incr.return_value = mock_pipeline
-            mock_pipeline.expire.return_value = mock_pipeline
-            mock_pipeline.execute.return_value = [11]  # Incremented count
-
-            # Mock Redis ping for health check
-            mock_redis.ping.return_value = True
-
-            # Mock HTTP responses
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_http.get = AsyncMock(return_value=mock_response)
-
-            response = client.get("/health")
-
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "healthy"
-            assert data["service"] == "api_gateway"
-            assert "dependencies" in data
-
-    def test_health_check_redis_failure(self):
-        """Test health check with Redis failure."""
-        with (
-            patch("api_gateway.main.redis_client") as mock_redis,
-            patch("api_gateway.main.http_client") as mock_http,
-        ):
-
-            # Mock Redis methods for rate limiting
-            mock_redis.get.return_value = "10"  # Normal rate limit count
-            mock_pipeline = Mock()
-            mock_redis.pipeline.return_value = mock_pipeline
-            mock_pipeline.incr.return_value = mock_pipeline
-            mock_pipeline.expire.return_value = mock_pipeline
-            mock_pipeline.execute.return_value = [11]  # Incremented count
+        api_gateway.main._health_cache = (0.0, {})  # Bypass the health cache
+        response = await client.get("/health")
 
-            # Mock Redis failure for health check
-            mock_redis.ping.side_effect = Exception("Redis connection failed")
-
-            # Mock HTTP responses
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_http.get = AsyncMock(return_value=mock_response)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert data["service"] == "api_gateway"
+        # One C-level superset check instead of a membership assert per key
+        assert data.keys() >= {"version", "dependencies"}
 
-            response = client.get("/health")
+    async def test_health_check_redis_failure(self, mock_redis, mock_http, client):
+        """Test health check with Redis failure."""
+        api_gateway.main._health_cache = (0.0, {})  # Bypass the health cache
+        mock_redis.ping_error = Exception("Redis connection failed")
+        response = await client.get("/health")
 
-            assert response.status_code == 200
-            data = response.json()
-            assert data["dependencies"]["redis"] == "unhealthy"
+        assert response.status_code == 200
+        data = response.json()
+        assert data["dependencies"]["redis"] == "unhealthy"
 
 
 class TestMetrics:
     """Test metrics endpoint."""
 
-    @patch("api_gateway.main.redis_client")
-    def test_metrics_endpoint(self, mock_redis):
+    async def test_metrics_endpoint(self, mock_redis, client):
         """Test metrics endpoint returns Prometheus format."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        response = client.get("/metrics")
+        response = await client.get("/metrics")
 
         assert response.status_code == 200
         assert "text/plain" in response.headers["content-type"]
@@ -100,232 +59,164 @@ class TestMetrics:
 class TestRoot:
     """Test root endpoint."""
 
-    @patch("api_gateway.main.redis_client")
-    def test_root_endpoint(self, mock_redis):
+    async def test_root_endpoint(self, mock_redis, client):
         """Test root endpoint returns service information."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        response = client.get("/")
+        response = await client.get("/")
 
         assert response.status_code == 200
         data = response.json()
         assert data["message"] == "DIAN Compliance Platform - API Gateway"
-        assert "version" in data
-        assert "environment" in data
-        assert "docs" in data
+        # One C-level superset check instead of a membership assert per key
+        assert data.keys() >= {"version", "environment", "docs"}
 
 
 class TestCorrelationId:
     """Test correlation ID functionality."""
 
-    @patch("api_gateway.main.redis_client")
-    def test_correlation_id_header(self, mock_redis):
+    async def test_correlation_id_header(self, mock_redis, client):
         """Test that correlation ID is added to response headers."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        response = client.get("/health")
+        response = await client.get("/health")
 
         assert "X-Correlation-ID" in response.headers
         assert response.headers["X-Correlation-ID"] is not None
 
-    @patch("api_gateway.main.redis_client")
-    def test_correlation_id_preserved(self, mock_redis):
+    async def test_correlation_id_preserved(self, mock_redis, client):
         """Test that provided correlation ID is preserved."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
         test_correlation_id = "test-correlation-id-123"
-        response = client.get(
+        response = await client.get(
             "/health", headers={"X-Correlation-ID": test_correlation_id}
         )
 
         assert response.headers["X-Correlation-ID"] == test_correlation_id
 
+    @respx.mock
+    async def test_correlation_id_not_duplicated_on_proxy(self, client):
+        """A backend echoing the correlation id must not duplicate the header."""
+        respx.get(path="/test-endpoint").mock(
+            return_value=httpx.Response(
+                200, json=_SUCCESS_JSON, headers={"X-Correlation-ID": "echoed"}
+            )
+        )
+
+        response = await client.get(
+            "/auth/test-endpoint", headers={"X-Correlation-ID": "client-id"}
+        )
+
+        assert response.headers.get_list("x-correlation-id") == ["client-id"]
+
 
 class TestRateLimiting:
     """Test rate limiting functionality."""
 
-    @patch("api_gateway.main.redis_client")
-    def test_rate_limit_exceeded(self, mock_redis):
+    @patch("api_gateway.main.RATE_LIMIT_SCRIPT", new_callable=AsyncMock)
+    async def test_rate_limit_exceeded(self, mock_script, client):
         """Test rate limit exceeded response."""
-        # Mock Redis to return rate limit exceeded
-        mock_redis.get.return_value = "60"  # Already at limit
+        # Mock the sliding-window script to report the limit is reached
+        mock_script.return_value = (0, 60)  # Already at limit
 
-        response = client.get("/health")
+        response = await client.get("/health")
 
         assert response.status_code == 429
         assert "Rate limit exceeded" in response.json()["detail"]
 
-    @patch("api_gateway.main.redis_client")
-    def test_rate_limit_normal(self, mock_redis):
+    @patch("api_gateway.main.RATE_LIMIT_SCRIPT", new_callable=AsyncMock)
+    async def test_rate_limit_normal(self, mock_script, client):
         """Test normal rate limiting."""
-        # Mock Redis to return normal count
-        mock_redis.get.return_value = "10"
+        # Mock the sliding-window script to allow the request
+        mock_script.return_value = (1, 11)
 
-        response = client.get("/health")
+        response = await client.get("/health")
 
         # Should not be rate limited
         assert response.status_code != 429
 
+    async def test_sliding_window_script(self, fake_redis):
+        """The Lua script admits exactly `limit` requests per window."""
+        script = fake_redis.register_script(api_gateway.main.RATE_LIMIT_LUA)
+
+        results = [
+            await script(keys=["rl:{test}"], args=[1_000_000 + i, 60_000, 3, i])
+            for i in range(5)
+        ]
+
+        # First three admitted, the rest rejected at the window limit
+        assert [allowed for allowed, _count in results] == [1, 1, 1, 0, 0]
+
 
 class TestCORS:
     """Test CORS functionality."""
 
-    @patch("api_gateway.main.redis_client")
-    def test_cors_headers(self, mock_redis):
-        """Test that CORS headers are present."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
+    def test_cors_configuration(self):
+        """Test that CORSMiddleware is installed with the expected config.
+
+        The round-trip behavior is covered upstream by Starlette and by the
+        integration suite; here an O(1) config check replaces a full ASGI
+        dispatch.
+        """
+        cors = next(
+            mw
+            for mw in api_gateway.main.app.user_middleware
+            if mw.cls is CORSMiddleware
+        )
 
-        # Test with GET request and Origin header to trigger CORS
-        response = client.get("/health", headers={"Origin": "http://localhost:3000"})
+        assert cors.kwargs["allow_credentials"] is True
+        assert "http://localhost:3000" in cors.kwargs["allow_origins"]
+        assert cors.kwargs["max_age"] == 86400
 
-        # CORS headers should be present for simple requests
-        assert "access-control-allow-origin" in response.headers
-        assert "access-control-allow-credentials" in response.headers
+    @respx.mock
+    async def test_cors_headers_on_proxied_response(self, client):
+        """Proxied responses must pass back out through CORSMiddleware.
 
+        Guards the middleware ordering: the gateway's proxy short-circuit
+        has to run inside CORS, or browsers pass preflight and then have
+        every actual proxied response blocked.
+        """
+        respx.get(path="/test-endpoint").mock(
+            return_value=httpx.Response(200, json=_SUCCESS_JSON)
+        )
 
-class TestServiceRouting:
-    """Test service routing functionality."""
+        response = await client.get(
+            "/auth/test-endpoint", headers={"Origin": "http://localhost:3000"}
+        )
 
-    @patch("api_gateway.main.redis_client")
-    @patch("api_gateway.main.http_client")
-    def test_auth_service_proxy(self, mock_http, mock_redis):
-        """Test auth service proxy routing."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.content = b'{"message": "success"}'
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_http.request = AsyncMock(return_value=mock_response)
-
-        response = client.get("/auth/test-endpoint")
-
-        # Should proxy to auth service
         assert response.status_code == 200
+        assert (
+            response.headers["access-control-allow-origin"] == "http://localhost:3000"
+        )
 
-    @patch("api_gateway.main.redis_client")
-    @patch("api_gateway.main.http_client")
-    def test_dian_service_proxy(self, mock_http, mock_redis):
-        """Test DIAN service proxy routing."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.content = b'{"message": "success"}'
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_http.request = AsyncMock(return_value=mock_response)
-
-        response = client.get("/dian/test-endpoint")
-
-        # Should proxy to DIAN service
-        assert response.status_code == 200
 
-    @patch("api_gateway.main.redis_client")
-    @patch("api_gateway.main.http_client")
-    def test_excel_service_proxy(self, mock_http, mock_redis):
-        """Test Excel service proxy routing."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.content = b'{"message": "success"}'
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_http.request = AsyncMock(return_value=mock_response)
-
-        response = client.get("/excel/test-endpoint")
-
-        # Should proxy to Excel service
-        assert response.status_code == 200
+class TestServiceRouting:
+    """Test service routing functionality."""
+
+    # Built once per module instead of re-formatting the URL in each test
+    URLS = tuple(
+        f"/{service}/test-endpoint" for service in ("auth", "dian", "excel", "pdf")
+    )
+
+    @pytest.mark.parametrize("url", URLS)
+    @respx.mock
+    async def test_service_proxy(self, url, mock_redis, client):
+        """Test proxy routing for each backend service."""
+        # Intercept at the httpx transport layer so the real build_request/
+        # send/streaming path is exercised, without hand-built mock chains
+        respx.get(path="/test-endpoint").mock(
+            return_value=httpx.Response(200, json=_SUCCESS_JSON)
+        )
+
+        response = await client.get(url)
 
-    @patch("api_gateway.main.redis_client")
-    @patch("api_gateway.main.http_client")
-    def test_pdf_service_proxy(self, mock_http, mock_redis):
-        """Test PDF service proxy routing."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.content = b'{"message": "success"}'
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_http.request = AsyncMock(return_value=mock_response)
-
-        response = client.get("/pdf/test-endpoint")
-
-        # Should proxy to PDF service
+        # Should proxy to the backend behind the prefix
         assert response.status_code == 200
 
-    @patch("api_gateway.main.redis_client")
-    @patch("api_gateway.main.http_client")
-    def test_service_unavailable(self, mock_http, mock_redis):
+    @respx.mock
+    async def test_service_unavailable(self, mock_redis, client):
         """Test service unavailable handling."""
-        # Mock Redis methods for rate limiting
-        mock_redis.get.return_value = "10"  # Normal rate limit count
-        mock_pipeline = Mock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        mock_pipeline.incr.return_value = mock_pipeline
-        mock_pipeline.expire.return_value = mock_pipeline
-        mock_pipeline.execute.return_value = [11]  # Incremented count
-
-        # Mock service failure with httpx.RequestError
-        import httpx
-
-        mock_http.request = AsyncMock(
-            side_effect=httpx.RequestError("Service unavailable")
+        # Mock service failure at the transport layer
+        respx.get(path="/test-endpoint").mock(
+            side_effect=httpx.ConnectError("Service unavailable")
         )
 
-        response = client.get("/auth/test-endpoint")
+        response = await client.get("/auth/test-endpoint")
 
         # Should return service unavailable error
         assert response.status_code == 503